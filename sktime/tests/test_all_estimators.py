@@ -595,14 +595,21 @@ class QuickTester:
                 if fixtures_to_exclude is not None and key in fixtures_to_exclude:
                     continue
 
+                # tests skipped via pytest.skip count as passed, as with return None
+                #   pytest.skip.Exception does not inherit from Exception
                 if not raise_exceptions:
                     try:
                         test_fun(**deepcopy(args))
                         results[key] = "PASSED"
+                    except pytest.skip.Exception:
+                        results[key] = "PASSED"
                     except Exception as err:
                         results[key] = err
                 else:
-                    test_fun(**deepcopy(args))
+                    try:
+                        test_fun(**deepcopy(args))
+                    except pytest.skip.Exception:
+                        pass
                     results[key] = "PASSED"
 
         return results
@@ -4,12 +4,81 @@
 __author__ = ["mloning", "fkiraly"]
 __all__ = []
 
-import pandas as pd
+import weakref
+
+import pytest
 
-from sktime.datatypes import check_is_scitype, convert_to
 from sktime.tests.test_all_estimators import BaseFixtureGenerator, QuickTester
 from sktime.utils._testing.estimator_checks import _assert_array_almost_equal
 
+# expected scitype of transform output, for (X scitype, trafo input, trafo output)
+#   transformers with "Primitives" output are not listed, these always return "Table"
+_EXPECTED_TRAFO_OUTPUT_SCITYPE = {
+    # series-to-series: input scitype equals output scitype
+    ("Series", "Series", "Series"): "Series",
+    ("Panel", "Series", "Series"): "Panel",
+    ("Hierarchical", "Series", "Series"): "Hierarchical",
+    # series-to-panel: series become panels, panels become hierarchical
+    ("Series", "Series", "Panel"): "Panel",
+    ("Panel", "Series", "Panel"): "Hierarchical",
+    ("Hierarchical", "Series", "Panel"): "Hierarchical",
+}
+
+# pd.DataFrame based mtypes of Series, Panel, Hierarchical, to convert to for masking
+#   this is a list, since convert_to accepts only str or list of str as to_type
+_DF_MTYPES = ["pd.DataFrame", "pd-multiindex", "pd_multiindex_hier"]
+
+# cache for check_is_scitype results on scenario inputs, which are shared by tests
+#   keys are (id of checked object, scitype, requested metadata fields)
+#   values are (weak reference to checked object, check_is_scitype return)
+#   entries are removed when the checked object is garbage collected
+_CHECK_IS_SCITYPE_CACHE = dict()
+
+
+def _check_is_scitype_cached(obj, scitype, metadata_fields):
+    """Return check_is_scitype(obj, scitype, return_metadata=metadata_fields), cached.
+
+    Intended for scenario inputs, which are the same objects for all estimators,
+    and which methods must not change, so they need to be checked only once.
+
+    obj is not hashable in general, so results are cached by id of obj, together
+    with a weak reference to obj, which is used to confirm identity on a hit.
+    Objects that cannot be weakly referenced, e.g., lists, are not cached.
+    """
+    from sktime.datatypes import check_is_scitype
+
+    try:
+        obj_ref = weakref.ref(obj)
+    except TypeError:
+        return check_is_scitype(obj, scitype=scitype, return_metadata=metadata_fields)
+
+    key = (id(obj), scitype, tuple(metadata_fields))
+    if key in _CHECK_IS_SCITYPE_CACHE:
+        cached_ref, result = _CHECK_IS_SCITYPE_CACHE[key]
+        if cached_ref() is obj:
+            return result
+
+    result = check_is_scitype(obj, scitype=scitype, return_metadata=metadata_fields)
+    _CHECK_IS_SCITYPE_CACHE[key] = (obj_ref, result)
+    weakref.finalize(obj, _CHECK_IS_SCITYPE_CACHE.pop, key, None)
+    return result
+
+
+def _as_numeric_array(obj):
+    """Return obj as numeric numpy array, or None if not numpy or pandas based.
+
+    Used for vectorized comparison of transform outputs. Returns None for objects
+    that need cell-wise comparison, e.g., nested_univ frames, or lists of frames.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        obj = obj.to_numpy(copy=False)
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in "biufc":
+        return obj
+    return None
+
 
 class TransformerFixtureGenerator(BaseFixtureGenerator):
     """Fixture generator for transformer tests.
@@ -31,6 +100,67 @@ class TransformerFixtureGenerator(BaseFixtureGenerator):
 
     estimator_type_filter = "transformer"
 
+    @staticmethod
+    def is_excluded(test_name, est):
+        """Shorthand to check whether test test_name is excluded for estimator est.
+
+        In addition to EXCLUDED_TESTS, excludes the test
+        test_transform_inverse_transform_equivalent for estimators without
+        inverse_transform, so no instances or scenarios are generated for them.
+        """
+        if test_name == "test_transform_inverse_transform_equivalent":
+            if not est.get_class_tag("capability:inverse_transform", False):
+                return True
+        return BaseFixtureGenerator.is_excluded(test_name, est)
+
+    # list of transformer classes to test, retrieved once and shared by all tests
+    _all_estimators_cached = None
+
+    def _all_estimators(self):
+        """Retrieve list of all transformer classes, once per test class.
+
+        pytest_generate_tests is called once per test function, and each call
+        retrieves the estimator classes, which crawls the package via all_estimators.
+        The result does not depend on the test, so it is retrieved only once.
+        """
+        cls = type(self)
+        if cls._all_estimators_cached is None:
+            cls._all_estimators_cached = super()._all_estimators()
+        return cls._all_estimators_cached
+
+    # test instances and names per transformer class, shared by all tests
+    #   the estimator_instance fixture clones these, so they are never changed
+    _test_instances_cached = dict()
+
+    def _generate_estimator_instance(self, test_name, **kwargs):
+        """Return estimator instance fixtures.
+
+        As _generate_estimator_instance of BaseFixtureGenerator, but test instances
+        are created once per estimator class, and then shared by all tests.
+
+        Fixtures parametrized
+        ---------------------
+        estimator_instance: instance of estimator inheriting from BaseObject
+            ranges over all estimator classes not excluded by EXCLUDED_TESTS
+            instances are generated by create_test_instance class method
+        """
+        estimator_classes_to_test, _ = self._generate_estimator_class(
+            test_name=test_name
+        )
+
+        instances_cache = self._test_instances_cached
+
+        estimator_instances_to_test = []
+        estimator_instance_names = []
+        for est in estimator_classes_to_test:
+            if est not in instances_cache:
+                instances_cache[est] = est.create_test_instances_and_names()
+            all_instances_of_est, instance_names = instances_cache[est]
+            estimator_instances_to_test += all_instances_of_est
+            estimator_instance_names += instance_names
+
+        return estimator_instances_to_test, estimator_instance_names
+
 
 class TestAllTransformers(TransformerFixtureGenerator, QuickTester):
     """Module level tests for all sktime transformers."""
@@ -39,23 +169,25 @@ class TestAllTransformers(TransformerFixtureGenerator, QuickTester):
         """Test that the capability:inverse_transform tag is set correctly."""
         capability_tag = estimator_instance.get_tag("capability:inverse_transform")
         skip_tag = estimator_instance.get_tag("skip-inverse-transform")
-        if capability_tag and not skip_tag:
-            assert estimator_instance._has_implementation_of("_inverse_transform")
+        if not capability_tag or skip_tag:
+            pytest.skip("estimator does not have or skips inverse_transform")
+        assert estimator_instance._has_implementation_of("_inverse_transform")
 
     def test_remember_data_tag_is_correct(self, estimator_instance):
         """Test that the remember_data tag is set correctly."""
         fit_empty_tag = estimator_instance.get_tag("fit_is_empty", True)
         remember_data_tag = estimator_instance.get_tag("remember_data", False)
-        msg = (
-            'if the "remember_data" tag is set to True, then the "fit_is_empty" tag '
-            "must be set to False, even if _fit is not implemented or empty. "
-            "This is due to boilerplate that write to self.X in fit. "
-            f"Please check these two tags in {type(estimator_instance)}."
-        )
         if fit_empty_tag and remember_data_tag:
+            msg = (
+                'if the "remember_data" tag is set to True, then the "fit_is_empty" '
+                "tag must be set to False, even if _fit is not implemented or empty. "
+                "This is due to boilerplate that write to self.X in fit. "
+                f"Please check these two tags in {type(estimator_instance)}."
+            )
             raise AssertionError(msg)
 
-    def _expected_trafo_output_scitype(self, X_scitype, trafo_input, trafo_output):
+    @staticmethod
+    def _expected_trafo_output_scitype(X_scitype, trafo_input, trafo_output):
         """Return expected output scitype, given X scitype and input/output.
 
         Parameters
@@ -67,20 +199,28 @@ class TestAllTransformers(TransformerFixtureGenerator, QuickTester):
         Returns
         -------
         expected scitype of the output of transform
+            None if the combination is not in _EXPECTED_TRAFO_OUTPUT_SCITYPE
         """
-        # if series-to-series: input scitype equals output scitype
-        if trafo_input == "Series" and trafo_output == "Series":
-            return X_scitype
+        # if output is primitives, the output is a table, for any input
         if trafo_output == "Primitives":
             return "Table"
-        if trafo_input == "Series" and trafo_output == "Panel":
-            if X_scitype == "Series":
-                return "Panel"
-            if X_scitype in ["Panel", "Hierarchical"]:
-                return "Hierarchical"
+        key = (X_scitype, trafo_input, trafo_output)
+        return _EXPECTED_TRAFO_OUTPUT_SCITYPE.get(key)
 
     def test_fit_transform_output(self, estimator_instance, scenario):
         """Test that transform output is of expected scitype."""
+        import pandas as pd
+
+        from sktime.datatypes import check_is_scitype
+
+        cls_name = type(estimator_instance).__name__
+
+        # skip the "number of instances" test below for Aggregator, Reconciler
+        #   reason: this adds "pseudo-instances" for the __total and increases the count
+        #   todo: we probably want to mirror this into a "hierarchical" tag later on
+        #   this is decided before fit/transform, to avoid computing unused metadata
+        skip_n_instances = cls_name in ["Aggregator", "Reconciler"]
+
         X = scenario.args["transform"]["X"]
         Xt = scenario.run(estimator_instance, method_sequence=["fit", "transform"])
 
@@ -88,48 +228,87 @@ class TestAllTransformers(TransformerFixtureGenerator, QuickTester):
         trafo_input = estimator_instance.get_tag("scitype:transform-input")
         trafo_output = estimator_instance.get_tag("scitype:transform-output")
 
-        # get metadata for X and ensure that X_scitype tag was correct
-        valid_X_scitype, _, X_metadata = check_is_scitype(
-            X, scitype=X_scitype, return_metadata=True
-        )
-        msg = (
-            f"error with scenario {type(scenario).__name__}, X_scitype tag "
-            f'was "{X_scitype}", but check_is_scitype does not confirm this'
-        )
-        assert valid_X_scitype, msg
-
         Xt_expected_scitype = self._expected_trafo_output_scitype(
             X_scitype, trafo_input, trafo_output
         )
 
-        valid_scitype, _, Xt_metadata = check_is_scitype(
-            Xt, scitype=Xt_expected_scitype, return_metadata=True
+        # metadata fields of X and Xt used in the checks below, we request only these
+        #   an empty list means that no metadata fields are computed
+        X_metadata_fields = []
+        Xt_metadata_fields = []
+        if not skip_n_instances:
+            s2s = trafo_input == "Series" and trafo_output == "Series"
+            s2p = trafo_input == "Series" and trafo_output == "Primitives"
+            p2p = trafo_input == "Panel" and trafo_output == "Panel"
+            if s2s and X_scitype in ["Panel", "Hierarchical"]:
+                X_metadata_fields += ["n_instances"]
+                Xt_metadata_fields += ["n_instances"]
+            if s2p and X_scitype == "Panel":
+                X_metadata_fields += ["n_instances"]
+                Xt_metadata_fields += ["n_instances"]
+            if s2p and X_scitype == "Series":
+                Xt_metadata_fields += ["n_instances"]
+            # the n_panels check needs Hierarchical output for Hierarchical input
+            #   panel-to-panel has no entry in _EXPECTED_TRAFO_OUTPUT_SCITYPE,
+            #   so this is currently never the case, and n_panels is not computed
+            if p2p and X_scitype == "Hierarchical":
+                if Xt_expected_scitype == "Hierarchical":
+                    X_metadata_fields += ["n_panels"]
+                    Xt_metadata_fields += ["n_panels"]
+
+        # get metadata for X and ensure that X_scitype tag was correct
+        #   X is scenario input, shared by all estimators, so the check is cached
+        valid_X_scitype, _, X_metadata = _check_is_scitype_cached(
+            X, X_scitype, X_metadata_fields
         )
+        if not valid_X_scitype:
+            msg = (
+                f"error with scenario {type(scenario).__name__}, X_scitype tag "
+                f'was "{X_scitype}", but check_is_scitype does not confirm this'
+            )
+            raise AssertionError(msg)
 
-        msg = (
-            f"{type(estimator_instance).__name__}.transform should return an object of "
-            f"scitype {Xt_expected_scitype} when given an input of scitype {X_scitype},"
-            f" but found the following return: {Xt}"
+        valid_scitype, _, Xt_metadata = check_is_scitype(
+            Xt, scitype=Xt_expected_scitype, return_metadata=Xt_metadata_fields
         )
-        assert valid_scitype, msg
+
+        # messages are only formatted on failure, the repr of Xt can be large
+        if not valid_scitype:
+            msg = (
+                f"{cls_name}.transform should return an object of scitype "
+                f"{Xt_expected_scitype} when given an input of scitype {X_scitype}, "
+                f"but found the following return: {Xt}"
+            )
+            raise AssertionError(msg)
 
         # we now know that Xt has its expected scitype
         # assign this variable for better readability
         Xt_scitype = Xt_expected_scitype
 
-        # skip the "number of instances" test below for Aggregator, Reconciler
-        #   reason: this adds "pseudo-instances" for the __total and increases the count
-        #   todo: we probably want to mirror this into a "hierarchical" tag later on
-        if type(estimator_instance).__name__ in ["Aggregator", "Reconciler"]:
+        if skip_n_instances:
             return None
 
+        # the checks below are independent, so we run all of them and collect failures
+        #   instead of stopping at the first, all use the metadata computed above
+        failures = []
+
         # if DataFrame is returned, columns must be unique
-        if hasattr(Xt, "columns"):
-            msg = (
-                f"{type(estimator_instance).__name__}.transform return should have "
-                f"unique column indices, but found {Xt.columns}"
-            )
-            assert Xt.columns.is_unique, msg
+        #   this covers all mtypes with columns of the scitypes in this test,
+        #   e.g., pd.DataFrame, pd-multiindex, pd_multiindex_hier, nested_univ
+        if isinstance(Xt, pd.DataFrame):
+            if not Xt.columns.is_unique:
+                failures.append(
+                    f"{cls_name}.transform return should have "
+                    f"unique column indices, but found {Xt.columns}"
+                )
+
+        def _check_equal(name, X_value, Xt_value):
+            """Record a failure if X_value and Xt_value are not equal."""
+            if X_value != Xt_value:
+                failures.append(
+                    f"{cls_name}.transform should preserve {name} of a {X_scitype} "
+                    f"input, but found {X_value} in input and {Xt_value} in output"
+                )
 
         # if we vectorize, number of instances before/after transform should be same
 
@@ -137,39 +316,57 @@ class TestAllTransformers(TransformerFixtureGenerator, QuickTester):
         if trafo_input == "Series" and trafo_output == "Series":
             if X_scitype == "Series" and Xt_scitype == "Series":
                 if estimator_instance.get_tag("transform-returns-same-time-index"):
-                    assert X.shape[0] == Xt.shape[0]
+                    _check_equal("number of time points", X.shape[0], Xt.shape[0])
             if X_scitype == "Panel" and Xt_scitype == "Panel":
-                assert X_metadata["n_instances"] == Xt_metadata["n_instances"]
+                _check_equal(
+                    "n_instances", X_metadata["n_instances"], Xt_metadata["n_instances"]
+                )
             if X_scitype == "Hierarchical" and Xt_scitype == "Hierarchical":
-                assert X_metadata["n_instances"] == Xt_metadata["n_instances"]
+                _check_equal(
+                    "n_instances", X_metadata["n_instances"], Xt_metadata["n_instances"]
+                )
 
         # panel-to-panel transformers
         if trafo_input == "Panel" and trafo_output == "Panel":
             if X_scitype == "Hierarchical" and Xt_scitype == "Hierarchical":
-                assert X_metadata["n_panels"] == Xt_metadata["n_panels"]
+                _check_equal(
+                    "n_panels", X_metadata["n_panels"], Xt_metadata["n_panels"]
+                )
 
         # series-to-primitives transformers
         if trafo_input == "Series" and trafo_output == "Primitives":
             if X_scitype == "Series":
-                assert Xt_metadata["n_instances"] == 1
+                _check_equal("n_instances", 1, Xt_metadata["n_instances"])
             if X_scitype == "Panel":
-                assert X_metadata["n_instances"] == Xt_metadata["n_instances"]
+                _check_equal(
+                    "n_instances", X_metadata["n_instances"], Xt_metadata["n_instances"]
+                )
+
+        if len(failures) > 0:
+            raise AssertionError("\n".join(failures))
 
         # todo: also test the expected mtype
 
     def test_transform_inverse_transform_equivalent(self, estimator_instance, scenario):
         """Test that inverse_transform is indeed inverse to transform."""
+        import pandas as pd
+        from numpy.testing import assert_allclose
+
+        from sktime.datatypes import convert_to
+        from sktime.datatypes._panel._check import is_nested_dataframe
+
         # skip this test if the estimator does not have inverse_transform
+        #   this is excluded in parametrization, but not in QuickTester.run_tests
         if not estimator_instance.get_class_tag("capability:inverse_transform", False):
-            return None
+            pytest.skip("estimator does not have inverse_transform")
 
         # skip this test if the estimator skips inverse_transform
         if estimator_instance.get_tag("skip-inverse-transform", False):
-            return None
+            pytest.skip("estimator skips inverse_transform")
 
         # skip this test if inverse_transform is not assumed an exact inverse
         if not estimator_instance.get_tag("capability:inverse_transform:exact", True):
-            return None
+            pytest.skip("inverse_transform of estimator is not exact")
 
         X = scenario.args["transform"]["X"]
         Xt = scenario.run(estimator_instance, method_sequence=["fit", "transform"])
@@ -182,19 +379,49 @@ class TestAllTransformers(TransformerFixtureGenerator, QuickTester):
 
         # check that the inverse transform is indeed the inverse
         # we check this only on entries within range of invertibility, if specified
+        #   numeric arrays are compared in one pass with assert_allclose,
+        #   with absolute tolerance equivalent to _assert_array_almost_equal, decimal=6
         inv_range = estimator_instance.get_tag("capability:inverse_transform:range")
         if inv_range is None:
-            _assert_array_almost_equal(X, Xit)
+            X_vals = _as_numeric_array(X)
+            Xit_vals = _as_numeric_array(Xit)
+            if X_vals is not None and Xit_vals is not None:
+                # univariate data can be of shape (n,) or (n, 1), e.g., pd.Series
+                #   and single column pd.DataFrame, we compare both as (n, 1)
+                if X_vals.ndim == 1:
+                    X_vals = X_vals.reshape(-1, 1)
+                if Xit_vals.ndim == 1:
+                    Xit_vals = Xit_vals.reshape(-1, 1)
+                assert_allclose(Xit_vals, X_vals, rtol=0, atol=1.5e-6)
+            # _assert_array_almost_equal compares frames only if nested or empty,
+            #   so a flat frame that is not numeric cannot be checked, we raise
+            elif isinstance(X, pd.DataFrame) and not is_nested_dataframe(X):
+                raise AssertionError(
+                    f"{type(estimator_instance).__name__}.inverse_transform output "
+                    "could not be compared with the input X, since X or the output "
+                    f"is not numeric. Found X dtypes {X.dtypes.tolist()}, "
+                    f"and output of type {type(Xit)}"
+                )
+            else:
+                _assert_array_almost_equal(X, Xit)
         else:
             # convert to pd.DataFrame so that we can use masks
-            df_types = ["pd.DataFrame", "pd-multiindex", "pd_multiindex_hier"]
-            X = convert_to(X, df_types)
-            Xit = convert_to(Xit, df_types)
+            #   X and Xit are of the scenario's X_scitype, passing it as as_scitype
+            #   restricts mtype inference in convert_to to mtypes of that scitype
+            X_scitype = scenario.get_tag("X_scitype")
+            X = convert_to(X, _DF_MTYPES, as_scitype=X_scitype)
+            Xit = convert_to(Xit, _DF_MTYPES, as_scitype=X_scitype)
 
             # mask entries of X outside range of invertibility
-            # then compare for identity
-            inside_mask = (X >= inv_range[0]) * (X <= inv_range[1])
-            _assert_array_almost_equal(X[inside_mask], Xit[inside_mask])
+            # then compare for identity, on the underlying numpy arrays
+            #   note: _assert_array_almost_equal, used here previously, compares
+            #   only nested or empty frames, so masked flat frames were not compared
+            X_vals = X.to_numpy(copy=False)
+            Xit_vals = Xit.to_numpy(copy=False)
+            inside_mask = (X_vals >= inv_range[0]) & (X_vals <= inv_range[1])
+            assert_allclose(
+                Xit_vals[inside_mask], X_vals[inside_mask], rtol=0, atol=1.5e-6
+            )
 
 
 # todo: add testing of inverse_transform
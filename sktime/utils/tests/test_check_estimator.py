@@ -6,6 +6,7 @@ import pytest
 
 from sktime.classification.dummy import DummyClassifier
 from sktime.forecasting.dummy import ForecastKnownValues
+from sktime.transformations.base import BaseTransformer
 from sktime.transformations.series.exponent import ExponentTransformer
 from sktime.utils.estimator_checks import check_estimator
 
@@ -57,3 +58,64 @@ def test_check_estimator_subset_tests():
     results_tests = {x.split("[")[0] for x in results.keys()}
 
     assert results_tests == expected_tests
+
+
+def test_check_estimator_skipped_tests_pass():
+    """Test that tests skipped via pytest.skip are reported as passed."""
+    from sktime.transformations.series.summarize import SummaryTransformer
+
+    tests_to_run = [
+        "test_capability_inverse_tag_is_correct",
+        "test_transform_inverse_transform_equivalent",
+    ]
+
+    results = check_estimator(
+        SummaryTransformer, verbose=False, tests_to_run=tests_to_run
+    )
+    assert len(results) > 0
+    assert all(x == "PASSED" for x in results.values())
+
+    check_estimator(
+        SummaryTransformer,
+        raise_exceptions=True,
+        verbose=False,
+        tests_to_run=tests_to_run,
+    )
+
+
+class _InverseTransformToCategory(BaseTransformer):
+    """Identity transformer whose inverse_transform returns category dtype."""
+
+    _tags = {
+        "scitype:transform-input": "Series",
+        "scitype:transform-output": "Series",
+        "scitype:instancewise": True,
+        "X_inner_mtype": "pd.DataFrame",
+        "y_inner_mtype": "None",
+        "fit_is_empty": True,
+        "transform-returns-same-time-index": True,
+        "capability:inverse_transform": True,
+    }
+
+    def _transform(self, X, y=None):
+        return X
+
+    def _inverse_transform(self, X, y=None):
+        return X.astype("category")
+
+
+def test_check_estimator_inverse_not_comparable_fails():
+    """Test that inverse_transform output that cannot be compared fails the test."""
+    results = check_estimator(
+        _InverseTransformToCategory,
+        verbose=False,
+        tests_to_run="test_transform_inverse_transform_equivalent",
+    )
+
+    # X of this scenario is a numeric, flat pd.DataFrame
+    scenario_name = "TransformerFitTransformSeriesMultivariate"
+    keys = [x for x in results.keys() if scenario_name in x]
+    assert len(keys) == 1
+    result = results[keys[0]]
+    assert isinstance(result, AssertionError)
+    assert "could not be compared" in str(result)